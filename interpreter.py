@@ -1,5 +1,8 @@
 import argparse
+import operator
+import re
 import sys
+import types
 from enum import Enum
 
 _SHOULD_LOG_SCOPE = False  # see '--scope' command line option
@@ -102,6 +105,8 @@ class TokenType(Enum):
 
 
 class Token:
+    __slots__ = ('type', 'value', 'lineno', 'column')
+
     def __init__(self, type, value, lineno=None, column=None):
         self.type = type
         self.value = value
@@ -124,33 +129,80 @@ def _build_reserved_keywords():
     tt_list = list(TokenType)
     start_index = tt_list.index(TokenType.PROGRAM)
     end_index = tt_list.index(TokenType.END)
-    reserved_keywords = {
-        token_type.value: token_type
-        for token_type in tt_list[start_index:end_index + 1]
-    }
+    reserved_keywords = {}
+    # keep the all-upper and all-lower spellings so most source text hits
+    # the table directly, without upper-casing the lexeme first
+    # the keys are interned like the identifiers the lexer looks up, so a
+    # hit compares by identity before falling back to string equality
+    for token_type in tt_list[start_index:end_index + 1]:
+        reserved_keywords[sys.intern(token_type.value)] = token_type
+        reserved_keywords[sys.intern(token_type.value.lower())] = token_type
     return reserved_keywords
 
 
-RESERVED_KEYWORDS = _build_reserved_keywords()
+# built once at import time; the lexer reads the plain dict, everyone else
+# gets a read-only view of it
+_KEYWORD_TYPES = _build_reserved_keywords()
+RESERVED_KEYWORDS = types.MappingProxyType(_KEYWORD_TYPES)
+# identifiers longer than this can never be reserved keywords
+_MAX_KEYWORD_LEN = max(len(keyword) for keyword in RESERVED_KEYWORDS)
+
+
+def _build_single_char_tokens():
+    # ':' and the quote are left out because they also start ':=' and
+    # string literals, which have their own lexer handlers
+    single_char_tokens = {
+        token_type.value: token_type
+        for token_type in TokenType
+        if len(token_type.value) == 1 and token_type.value not in ':\''
+    }
+    return single_char_tokens
+
+
+SINGLE_CHAR_TOKENS = _build_single_char_tokens()
+
+# returned for every request past the end of input
+_EOF_TOKEN = Token(type=TokenType.EOF, value=None)
+
+# every operator lexeme, including the ':=' and ':' left out of
+# SINGLE_CHAR_TOKENS
+_OPERATOR_TOKENS = dict(SINGLE_CHAR_TOKENS)
+_OPERATOR_TOKENS[TokenType.ASSIGN.value] = TokenType.ASSIGN
+_OPERATOR_TOKENS[TokenType.COLON.value] = TokenType.COLON
+
+# one pattern for the whole lexical grammar; the name of the group that
+# matched tells the lexer which kind of lexeme it got. Alternatives are
+# tried in order, so ':=' is listed before ':' and anything no other group
+# accepts falls through to MISMATCH.
+_TOKEN_RE = re.compile(r'''
+    (?P<WHITESPACE>\s+)
+  | (?P<ID>[^\W\d_][^\W_]*)             # isalpha, then isalnum characters
+  | (?P<OPERATOR>{operators})
+  | (?P<NUMBER>\d+(?:\.(?!\.)\d*)?)     # a '.' starting '..' is a range
+  | (?P<STRING>'[^']*'?)                # unterminated runs to end of input
+  | (?P<COMMENT>\{{[^}}]*\}}?)           # unterminated runs to end of input
+  | (?P<MISMATCH>.)
+'''.format(operators='|'.join(
+    re.escape(lexeme)
+    for lexeme in sorted(_OPERATOR_TOKENS, key=len, reverse=True)
+)), re.VERBOSE | re.DOTALL)
+
+# interned identifier -> interned upper-case spelling, so recurring names
+# (BEGIN, END, loop counters, ...) are upper-cased only once per program
+_UPPER_CACHE = {}
 
 
 class Lexer:
 
     def __init__(self, text):
-        self.quote_count = 0
         self.text = text
-        # self.pos is index for self.text
+        # position of the lexeme being scanned, kept for error reporting
         self.pos = 0
-        self.current_char = self.text[self.pos]
+        self.current_char = None
         # token line number and column number
         self.lineno = 1
         self.column = 1
-
-
-    def log(self, msg):
-        if _SHOULD_LOG_LEXER:
-            print(msg)
-
+        self._tokens = self._tokenize()
 
     def error(self):
         s = "Lexer error on '{lexeme}' line: {lineno} column: {column}".format(
@@ -160,184 +212,101 @@ class Lexer:
         )
         raise LexerError(message=s)
 
-    def advance(self):
-        """Advance the `pos` pointer and set the `current_char` variable."""
-        if self.current_char == '\n':
-            self.lineno += 1
-            self.column = 0
-
-        self.pos += 1
-        if self.pos > len(self.text) - 1:
-            self.current_char = None  # end of input
-        else:
-            self.current_char = self.text[self.pos]
-            self.column += 1
-
-    def look_at_next_char(self):
-        look_at_next_char_pos = self.pos + 1
-        if look_at_next_char_pos > len(self.text) - 1:
-            return None
-        else:
-            return self.text[look_at_next_char_pos]
-
-    def skip_whitespace(self):
-        while self.current_char is not None and self.current_char.isspace():
-            self.advance()
-
-    def skip_comment(self):
-        while self.current_char != '}':
-            self.advance()
-        self.advance()  # for the closing curly brace
-
-    def number(self):
-        """Return a (multidigit) integer or float consumed from the input."""
-
-        # Create a new token with current line and column number
-        token = Token(type=None, value=None, lineno=self.lineno, column=self.column)
-
-        result = ''
-        while self.current_char is not None and self.current_char.isdigit():
-            result += self.current_char
-            self.advance()
-
-        if self.current_char == '.' and not self.look_at_next_char() == '.':
-            result += self.current_char
-            self.advance()
+    def _tokenize(self):
+        """Yield the tokens of `text`, one regex match per lexeme"""
+        text = self.text
+        lineno = 1
+        line_start = 0  # index of the first character of line `lineno`
+
+        for match in _TOKEN_RE.finditer(text):
+            kind = match.lastgroup
+            start = match.start()
+            column = start - line_start + 1
+
+            if kind == 'WHITESPACE' or kind == 'COMMENT' or kind == 'STRING':
+                end = match.end()
+                if kind == 'STRING':
+                    token = self.string_builder(
+                        match.group(), lineno, column + 1,  # past the quote
+                    )
+                    if token is not None:
+                        yield token
+                # only these lexemes can span several lines
+                newlines = text.count('\n', start, end)
+                if newlines:
+                    lineno += newlines
+                    line_start = text.rindex('\n', start, end) + 1
+            elif kind == 'ID':
+                value = match.group()
+                if value[0] > '\x7f' and not value[0].isalpha():
+                    # \w also takes non-decimal digits such as '²'
+                    self._error_at(value[0], start, lineno, column)
+                yield self._id(value, lineno, column)
+            elif kind == 'OPERATOR':
+                token_type = _OPERATOR_TOKENS[match.group()]
+                token = Token(token_type, token_type.value, lineno, column)
+                if _SHOULD_LOG_LEXER:
+                    print(f'Token : {token}')
+                yield token
+            elif kind == 'NUMBER':
+                yield self.number(match.group(), lineno, column)
+            else:
+                self._error_at(match.group(), start, lineno, column)
 
-            while self.current_char is not None and self.current_char.isdigit():
-                result += self.current_char
-                self.advance()
+    def _error_at(self, char, pos, lineno, column):
+        self.pos = pos
+        self.current_char = char
+        self.lineno = lineno
+        self.column = column
+        self.error()
 
-            token.type = TokenType.REAL_CONST
-            token.value = float(result)
+    def number(self, lexeme, lineno, column):
+        """Return an integer or float token for a numeric lexeme."""
+        if '.' in lexeme:
+            token = Token(TokenType.REAL_CONST, float(lexeme), lineno, column)
         else:
-            token.type = TokenType.INTEGER_CONST
-            token.value = int(result)
-        self.log(f'Number : {token}')
+            token = Token(TokenType.INTEGER_CONST, int(lexeme), lineno, column)
+        if _SHOULD_LOG_LEXER:
+            print(f'Number : {token}')
         return token
 
-
-    def string_builder(self):
+    def string_builder(self, lexeme, lineno, column):
         """Handles building strings"""
-        # Create a new token with current line and column number
-        token = Token(type=None, value=None, lineno=self.lineno, column=self.column)
-        result = ''
-
-        while self.current_char is not None and self.current_char != '\'':
-            result += self.current_char
-            self.advance()
-
-        if self.current_char == '\'':
-            self.advance()
-            self.quote_count = 0
-            token.type = TokenType.STRING_CONST
-            token.value = result
-            self.log(f'Token : {token}')
-            return token
-
-    def char_builder(self):
-        """Handles building chars"""
-        # Create a new token with current line and column number
-        token = Token(type=None, value=None, lineno=self.lineno, column=self.column)
-        char = ''
-
-        char += self.current_char
-        token.type = TokenType.CHAR_CONST
-        token.value = char
-        self.advance()
-
+        if len(lexeme) < 2 or lexeme[-1] != '\'':
+            # unterminated string runs to the end of input
+            return None
+        token = Token(TokenType.STRING_CONST, lexeme[1:-1], lineno, column)
+        if _SHOULD_LOG_LEXER:
+            print(f'Token : {token}')
         return token
 
-
-
-    def _id(self):
+    def _id(self, value, lineno, column):
         """Handle identifiers and reserved keywords"""
+        value = sys.intern(value)
+        if len(value) > _MAX_KEYWORD_LEN:
+            token_type = None
+        else:
+            token_type = _KEYWORD_TYPES.get(value)
+            if token_type is None:
+                # mixed-case spelling, e.g. 'Begin'
+                upper = _UPPER_CACHE.get(value)
+                if upper is None:
+                    upper = _UPPER_CACHE[value] = sys.intern(value.upper())
+                token_type = _KEYWORD_TYPES.get(upper)
 
-        # Create a new token with current line and column number
-        token = Token(type=None, value=None, lineno=self.lineno, column=self.column)
-
-        value = ''
-
-        # if self.current_char.i() and not (self.look_at_next_char().isalnum() or self.look_at_next_char().isalpha()):
-        #     token.type = TokenType.CHAR_CONST
-        #     token.value = value
-        #     print(token)
-        #     return token
-
-        while self.current_char is not None and self.current_char.isalnum():
-            value += self.current_char
-            self.advance()
-
-        token_type = RESERVED_KEYWORDS.get(value.upper())
         if token_type is None:
-            token.type = TokenType.ID
-            token.value = value
+            token = Token(TokenType.ID, value, lineno, column)
         else:
             # reserved keyword
-            token.type = token_type
-            token.value = value.upper()
-        self.log(f'ID : {token}')
+            token = Token(token_type, token_type.value, lineno, column)
+        if _SHOULD_LOG_LEXER:
+            print(f'ID : {token}')
         return token
 
     def get_next_token(self):
-
-        while self.current_char is not None:
-
-            if self.current_char == ':' and self.look_at_next_char() == '=':
-                token = Token(
-                    type=TokenType.ASSIGN,
-                    value=TokenType.ASSIGN.value,  # ':='
-                    lineno=self.lineno,
-                    column=self.column,
-                )
-                self.advance()
-                self.advance()
-                self.log(f'Token : {token}')
-                return token
-
-            if self.current_char.isspace():
-                self.skip_whitespace()
-                continue
-
-            if (self.current_char == '\''):
-                self.advance()
-                self.quote_count = 1
-                return self.string_builder()
-
-
-            if self.current_char == '{':
-                self.advance()
-                self.skip_comment()
-                continue
-
-            if self.current_char.isalpha():
-                return self._id()
-
-            if self.current_char.isdigit():
-                return self.number()
-
-
-            # for single-character token
-            try:
-                token_type = TokenType(self.current_char)
-            except ValueError:
-                # no enum member with value equal to self.current_char
-                self.error()
-            else:
-                # create a token with a single-character lexeme as its value
-                token = Token(
-                    type=token_type,
-                    value=token_type.value,  # e.g. ';', '.', etc
-                    lineno=self.lineno,
-                    column=self.column,
-                )
-                self.advance()
-                self.log(f'Token : {token}')
-                return token
-
         # EOF (end-of-file) token indicates that there is no more
         # input left for lexical analysis
-        return Token(type=TokenType.EOF, value=None)
+        return next(self._tokens, _EOF_TOKEN)
 
 
 
@@ -363,28 +332,64 @@ class Lexer:
 #  PARSER                                                                     #
 #                                                                             #
 ###############################################################################
+
+def _float_div(left, right):
+    # '/' converts both operands first, keeping the rounding and overflow
+    # of float(left) / float(right) for large integers
+    return float(left) / float(right)
+
+
+# Python functions for the arithmetic operators, resolved once per node when
+# the AST is built so the interpreter never re-inspects the operator token
+_BIN_OPS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MUL: operator.mul,
+    TokenType.INTEGER_DIV: operator.floordiv,
+    TokenType.FLOAT_DIV: _float_div,
+}
+_UNARY_OPS = {
+    TokenType.PLUS: operator.pos,
+    TokenType.MINUS: operator.neg,
+}
+
+
 class AST:
-    pass
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # name of the NodeVisitor method for this node class
+        cls._visit_method = 'visit_' + cls.__name__
 
 
 class BinOp(AST):
+    __slots__ = ('left', 'token', 'op', 'right', 'eval_fn')
+
     def __init__(self, left, op, right):
         self.left = left
         self.token = self.op = op
         self.right = right
+        self.eval_fn = _BIN_OPS[op.type]
 
 
 class Num(AST):
+    __slots__ = ('token', 'value')
+
     def __init__(self, token):
         self.token = token
         self.value = token.value
 
 class Str(AST):
+    __slots__ = ('token', 'value')
+
     def __init__(self, token):
         self.token = token
         self.value = token.value
 
 class Relation(AST):
+    __slots__ = ('left', 'token', 'right')
+
     def __init__(self, left, token, right):
         self.left = left
         self.token = token
@@ -392,39 +397,54 @@ class Relation(AST):
 
 
 class IO(AST):
+    __slots__ = ('value', 'token', 'op')
+
     def __init__(self, op, tk):
         self.value = tk.value
         self.token = self.op = op
 
 class WRITE(AST):
+    __slots__ = ('value', 'token', 'op')
+
     def __init__(self, op, tk):
         self.value = tk.value
         self.token = self.op = op
 
 class READ(AST):
+    __slots__ = ('value', 'token', 'op')
+
     def __init__(self, op, tk):
         self.value = tk
         self.token = self.op = op
 
 class UnaryOp(AST):
+    __slots__ = ('token', 'op', 'expr', 'eval_fn')
+
     def __init__(self, op, expr):
         self.token = self.op = op
         self.expr = expr
+        self.eval_fn = _UNARY_OPS[op.type]
 
 class Array(AST):
-    def __init__(self, start_len, end_len, type, members = []):
+    __slots__ = ('start', 'end', 'value', 'members')
+
+    def __init__(self, start_len, end_len, type, members=None):
         self.start = start_len
         self.end = end_len
         self.value = type.value
-        self.members = members
+        self.members = members or ()
 
 class Compound(AST):
     """Represents a 'BEGIN ... END' block"""
+    __slots__ = ('children',)
+
     def __init__(self):
-        self.children = []
+        self.children = ()
 
 
 class Assign(AST):
+    __slots__ = ('left', 'token', 'op', 'right')
+
     def __init__(self, left, op, right):
         self.left = left
         self.token = self.op = op
@@ -441,28 +461,44 @@ class Assign(AST):
 
 class Var(AST):
     """The Var node is constructed out of ID token."""
+    __slots__ = ('token', 'value', 'slot')
+
     def __init__(self, token):
         self.token = token
         self.value = token.value
+        # index into the activation record's slots, set by semantic analysis
+        self.slot = None
 
 
 class NoOp(AST):
-    pass
+    __slots__ = ()
+
+
+# NoOp carries no state, so every empty statement shares this node
+_NOOP = NoOp()
 
 
 class Program(AST):
+    __slots__ = ('name', 'block', 'slot_names')
+
     def __init__(self, name, block):
         self.name = name
         self.block = block
+        # names of the program activation record's slots, in slot order
+        self.slot_names = ()
 
 
 class Block(AST):
+    __slots__ = ('declarations', 'compound_statement')
+
     def __init__(self, declarations, compound_statement):
         self.declarations = declarations
         self.compound_statement = compound_statement
 
 
 class VarDecl(AST):
+    __slots__ = ('var_node', 'type_node')
+
     def __init__(self, var_node, type_node):
         self.var_node = var_node
         self.type_node = type_node
@@ -470,33 +506,51 @@ class VarDecl(AST):
 
 
 class Type(AST):
+    __slots__ = ('token', 'value')
+
     def __init__(self, token):
         self.token = token
         self.value = token.value
 
 
+# The builtin scalar types are fully described by their token type, so every
+# declaration of one shares a single Type node
+_TYPE_SINGLETONS = {
+    token_type: Type(Token(token_type, token_type.value))
+    for token_type in (TokenType.INTEGER, TokenType.REAL, TokenType.CHAR)
+}
+
+
 class Param(AST):
+    __slots__ = ('var_node', 'type_node')
+
     def __init__(self, var_node, type_node):
         self.var_node = var_node
         self.type_node = type_node
 
 
 class ProcedureDecl(AST):
+    __slots__ = ('proc_name', 'formal_params', 'block_node')
+
     def __init__(self, proc_name, formal_params, block_node):
         self.proc_name = proc_name
-        self.formal_params = formal_params  # a list of Param nodes
+        self.formal_params = formal_params  # a tuple of Param nodes
         self.block_node = block_node
 
 
 class ProcedureCall(AST):
+    __slots__ = ('proc_name', 'actual_params', 'token', 'proc_symbol')
+
     def __init__(self, proc_name, actual_params, token):
         self.proc_name = proc_name
-        self.actual_params = actual_params  # a list of AST nodes
+        self.actual_params = actual_params  # a tuple of AST nodes
         self.token = token
         # a reference to procedure declaration symbol
         self.proc_symbol = None
 
 class IfStatement(AST):
+    __slots__ = ('name', 'expr', 'statement', 'elseStatement')
+
     def __init__(self, token,expr, statement, else_statement=None):
         self.name = token
         self.expr = expr
@@ -504,6 +558,8 @@ class IfStatement(AST):
         self.elseStatement = else_statement
 
 class WhileStatement(AST):
+    __slots__ = ('name', 'expr', 'statement')
+
     def __init__(self, token, expr, statement):
         self.name = token
         self.expr = expr
@@ -511,14 +567,45 @@ class WhileStatement(AST):
 
 
 
+# operator token types accepted by expr, term and relation_statement
+_ADD_OPS = frozenset({TokenType.PLUS, TokenType.MINUS})
+_MUL_OPS = frozenset({TokenType.MUL, TokenType.INTEGER_DIV, TokenType.FLOAT_DIV})
+_REL_OPS = frozenset({
+    TokenType.EQUAL,
+    TokenType.LESS,
+    TokenType.GREATER,
+    TokenType.LESSEQUAL,
+    TokenType.GREATEREQUAL,
+    TokenType.AND,
+    TokenType.OR,
+})
+
+
 class Parser:
     def __init__(self, lexer):
         self.lexer = lexer
+        self._prime()
         # set current token to the first token taken from the input
-        self.current_token = self.get_next_token()
+        self.current_token = self._tokens[0]
+        # self._eat_semi(), self._eat_id(), ... : eat() specialized per type
+        for token_type in TokenType:
+            setattr(self, '_eat_' + token_type.name.lower(), self._make_eater(token_type))
+
+    def _prime(self):
+        """Drain the lexer into `self._tokens`, ending with the EOF token"""
+        tokens = []
+        token = self.lexer.get_next_token()
+        while token.type is not TokenType.EOF:
+            tokens.append(token)
+            token = self.lexer.get_next_token()
+        tokens.append(token)
+        self._tokens = tokens
+        # self._i is the index of self.current_token in self._tokens
+        self._i = 0
 
     def get_next_token(self):
-        return self.lexer.get_next_token()
+        self._i += 1
+        return self._tokens[self._i]
 
     def error(self, error_code, token):
         raise ParserError(
@@ -529,7 +616,7 @@ class Parser:
 
     def eat(self, token_type):
         # consume token if type match and move to the next token
-        if self.current_token.type == token_type:
+        if self.current_token.type is token_type:
             self.current_token = self.get_next_token()
         else:
             self.error(
@@ -537,15 +624,28 @@ class Parser:
                 token=self.current_token,
             )
 
+    def _make_eater(self, token_type):
+        """Return eat() with `token_type` (and self) bound as fast locals"""
+        def eater(_token_type=token_type, _self=self):
+            if _self.current_token.type is _token_type:
+                _self._i += 1
+                _self.current_token = _self._tokens[_self._i]
+            else:
+                _self.error(
+                    error_code=ErrorCode.UNEXPECTED_TOKEN,
+                    token=_self.current_token,
+                )
+        return eater
+
     def program(self):
         """program : PROGRAM variable SEMI block DOT"""
-        self.eat(TokenType.PROGRAM)
+        self._eat_program()
         var_node = self.variable()
         prog_name = var_node.value
-        self.eat(TokenType.SEMI)
+        self._eat_semi()
         block_node = self.block()
         program_node = Program(prog_name, block_node)
-        self.eat(TokenType.DOT)
+        self._eat_dot()
         return program_node
 
     def block(self):
@@ -561,31 +661,31 @@ class Parser:
         """
         declarations = []
 
-        if self.current_token.type == TokenType.VAR:
-            self.eat(TokenType.VAR)
-            while self.current_token.type == TokenType.ID:
+        if self.current_token.type is TokenType.VAR:
+            self._eat_var()
+            while self.current_token.type is TokenType.ID:
                 var_decl = self.variable_declaration()
                 declarations.extend(var_decl)
-                self.eat(TokenType.SEMI)
+                self._eat_semi()
 
-        while self.current_token.type == TokenType.PROCEDURE:
+        while self.current_token.type is TokenType.PROCEDURE:
             proc_decl = self.procedure_declaration()
             declarations.append(proc_decl)
 
-        return declarations
+        return tuple(declarations)
 
     def formal_parameters(self):
         """ formal_parameters : ID (COMMA ID)* COLON type_spec """
         param_nodes = []
 
         param_tokens = [self.current_token]
-        self.eat(TokenType.ID)
-        while self.current_token.type == TokenType.COMMA:
-            self.eat(TokenType.COMMA)
+        self._eat_id()
+        while self.current_token.type is TokenType.COMMA:
+            self._eat_comma()
             param_tokens.append(self.current_token)
-            self.eat(TokenType.ID)
+            self._eat_id()
 
-        self.eat(TokenType.COLON)
+        self._eat_colon()
         type_node = self.type_spec()
         #print(param_tokens)
         for param_token in param_tokens:
@@ -600,13 +700,13 @@ class Parser:
                                   | formal_parameters SEMI formal_parameter_list
         """
 
-        if not self.current_token.type == TokenType.ID:
+        if self.current_token.type is not TokenType.ID:
             return []
 
         param_nodes = self.formal_parameters()
 
-        while self.current_token.type == TokenType.SEMI:
-            self.eat(TokenType.SEMI)
+        while self.current_token.type is TokenType.SEMI:
+            self._eat_semi()
             param_nodes.extend(self.formal_parameters())
 
         return param_nodes
@@ -614,14 +714,14 @@ class Parser:
     def variable_declaration(self):
         """variable_declaration : ID (COMMA ID)* COLON type_spec"""
         var_nodes = [Var(self.current_token)]  # first ID
-        self.eat(TokenType.ID)
+        self._eat_id()
 
-        while self.current_token.type == TokenType.COMMA:
-            self.eat(TokenType.COMMA)
+        while self.current_token.type is TokenType.COMMA:
+            self._eat_comma()
             var_nodes.append(Var(self.current_token))
-            self.eat(TokenType.ID)
+            self._eat_id()
 
-        self.eat(TokenType.COLON)
+        self._eat_colon()
 
         type_node = self.type_spec()
         var_declarations = [
@@ -634,20 +734,20 @@ class Parser:
         """procedure_declaration :
              PROCEDURE ID (LPAREN formal_parameter_list RPAREN)? SEMI block SEMI
         """
-        self.eat(TokenType.PROCEDURE)
+        self._eat_procedure()
         proc_name = self.current_token.value
-        self.eat(TokenType.ID)
+        self._eat_id()
         formal_params = []
 
-        if self.current_token.type == TokenType.LPAREN:
-            self.eat(TokenType.LPAREN)
+        if self.current_token.type is TokenType.LPAREN:
+            self._eat_lparen()
             formal_params = self.formal_parameter_list()
-            self.eat(TokenType.RPAREN)
+            self._eat_rparen()
 
-        self.eat(TokenType.SEMI)
+        self._eat_semi()
         block_node = self.block()
-        proc_decl = ProcedureDecl(proc_name, formal_params, block_node)
-        self.eat(TokenType.SEMI)
+        proc_decl = ProcedureDecl(proc_name, tuple(formal_params), block_node)
+        self._eat_semi()
         return proc_decl
 
     def type_spec(self):
@@ -659,28 +759,26 @@ class Parser:
         """
         token = self.current_token
         members = [] #TODO: grab members of array
-        if self.current_token.type == TokenType.INTEGER:
-            self.eat(TokenType.INTEGER)
-        elif self.current_token.type == TokenType.REAL:
-            self.eat(TokenType.REAL)
-        elif self.current_token.type == TokenType.STRING_CONST:
-            self.eat(TokenType.STRING_CONST)
-        elif self.current_token.type == TokenType.CHAR:
-            self.eat(TokenType.CHAR)
-        elif self.current_token.type == TokenType.ARRAY:
-            self.eat(TokenType.ARRAY)
-            self.eat(TokenType.LBRACK)
+        type_node = _TYPE_SINGLETONS.get(token.type)
+        if type_node is not None:
+            self.eat(token.type)
+            return type_node
+        elif self.current_token.type is TokenType.STRING_CONST:
+            self._eat_string_const()
+        elif self.current_token.type is TokenType.ARRAY:
+            self._eat_array()
+            self._eat_lbrack()
             Start_len = self.current_token.value
-            self.eat(TokenType.INTEGER_CONST)
-            self.eat(TokenType.DOT)
-            self.eat(TokenType.DOT)
+            self._eat_integer_const()
+            self._eat_dot()
+            self._eat_dot()
             End_len = self.current_token.value
-            self.eat(TokenType.INTEGER_CONST)
-            self.eat(TokenType.RBRACK)
-            self.eat(TokenType.OF)
-            if self.current_token.type == TokenType.INTEGER:
+            self._eat_integer_const()
+            self._eat_rbrack()
+            self._eat_of()
+            if self.current_token.type is TokenType.INTEGER:
                 type = TokenType.INTEGER
-                self.eat(TokenType.INTEGER)
+                self._eat_integer()
             array = Array(Start_len, End_len, type, members)
             return array
         node = Type(token)
@@ -690,13 +788,12 @@ class Parser:
         """
         compound_statement: BEGIN statement_list END
         """
-        self.eat(TokenType.BEGIN)
+        self._eat_begin()
         nodes = self.statement_list()
-        self.eat(TokenType.END)
+        self._eat_end()
 
         root = Compound()
-        for node in nodes:
-            root.children.append(node)
+        root.children = tuple(nodes)
 
         return root
 
@@ -709,8 +806,8 @@ class Parser:
 
         results = [node]
 
-        while self.current_token.type == TokenType.SEMI:
-            self.eat(TokenType.SEMI)
+        while self.current_token.type is TokenType.SEMI:
+            self._eat_semi()
             results.append(self.statement())
 
         return results
@@ -718,14 +815,14 @@ class Parser:
 
     def get_write_parameter(self, io):
         #TODO: Change it so read and readln take in parameters
-        if not self.current_token.type == TokenType.STRING_CONST:
+        if self.current_token.type is not TokenType.STRING_CONST:
             return []
 
         node = Str(self.current_token)
-        self.eat(TokenType.STRING_CONST)
+        self._eat_string_const()
 
-        while self.current_token.type == TokenType.SEMI:
-            self.eat(TokenType.SEMI)
+        while self.current_token.type is TokenType.SEMI:
+            self._eat_semi()
             param_nodes.extend(self.formal_parameters())
 
         return node
@@ -735,21 +832,21 @@ class Parser:
         param_nodes = []
 
         param_tokens = [self.current_token]
-        self.eat(TokenType.ID)
-        while self.current_token.type == TokenType.COMMA:
-            self.eat(TokenType.COMMA)
+        self._eat_id()
+        while self.current_token.type is TokenType.COMMA:
+            self._eat_comma()
             param_tokens.append(self.current_token)
-            self.eat(TokenType.ID)
+            self._eat_id()
 
         return param_tokens
 
     def get_read_parameter(self, io):
-        if not self.current_token.type == TokenType.ID:
+        if self.current_token.type is not TokenType.ID:
             return []
 
         param_nodes = self.read_parameters()
-        while self.current_token.type == TokenType.SEMI:
-            self.eat(TokenType.SEMI)
+        while self.current_token.type is TokenType.SEMI:
+            self._eat_semi()
             param_nodes.extend(self.formal_parameters())
 
         return param_nodes
@@ -761,34 +858,34 @@ class Parser:
                           | write '(' 'String' ')'
                           | writeln  '(' 'String' ')'
         """
-        if self.current_token.type == TokenType.READ:
+        if self.current_token.type is TokenType.READ:
             read_tk = TokenType.READ
-            self.eat(TokenType.READ)
-            self.eat(TokenType.LPAREN)
+            self._eat_read()
+            self._eat_lparen()
             formal_params = self.get_read_parameter(read_tk)
             node = READ(read_tk, formal_params)
-            self.eat(TokenType.RPAREN)
-        elif self.current_token.type == TokenType.READLN:
+            self._eat_rparen()
+        elif self.current_token.type is TokenType.READLN:
             readln_tk = TokenType.READLN
-            self.eat(TokenType.READLN)
-            self.eat(TokenType.LPAREN)
+            self._eat_readln()
+            self._eat_lparen()
             formal_params = self.get_read_parameter(readln_tk)
             node = READ(readln_tk, formal_params)
-            self.eat(TokenType.RPAREN)
-        elif self.current_token.type == TokenType.WRITE:
+            self._eat_rparen()
+        elif self.current_token.type is TokenType.WRITE:
             write_tk = TokenType.WRITE
-            self.eat(TokenType.WRITE)
-            self.eat(TokenType.LPAREN)
+            self._eat_write()
+            self._eat_lparen()
             formal_params = self.get_write_parameter(write_tk)
             node = WRITE(write_tk, formal_params)
-            self.eat(TokenType.RPAREN)
-        elif self.current_token.type == TokenType.WRITELN:
+            self._eat_rparen()
+        elif self.current_token.type is TokenType.WRITELN:
             writeln_tk = TokenType.WRITELN
-            self.eat(TokenType.WRITELN)
-            self.eat(TokenType.LPAREN)
+            self._eat_writeln()
+            self._eat_lparen()
             formal_params = self.get_write_parameter(writeln_tk)
             node = WRITE(writeln_tk, formal_params)
-            self.eat(TokenType.RPAREN)
+            self._eat_rparen()
         else:
             raise Exception('no match in io_statement')
 
@@ -806,31 +903,27 @@ class Parser:
                   | IF, IF/ELSE, WHILE
                   | empty
         """
-        if self.current_token.type == TokenType.BEGIN:
-            node = self.compound_statement()
-        elif (self.current_token.type == TokenType.ID and
-              self.lexer.current_char == '('
-        ):
-            node = self.proccall_statement()
-        elif self.current_token.type == TokenType.ID:
-            node = self.assignment_statement()
-
-        elif self.current_token.type == TokenType.WRITELN or self.current_token.type == TokenType.WRITE or self.current_token.type == TokenType.READ or self.current_token.type == TokenType.READLN:
-            node = self.io_statement()
-        elif self.current_token.type == TokenType.IF:
-            node = self.if_statement()
-        elif self.current_token.type == TokenType.WHILE:
-            node = self.while_statement()
-        else:
-            node = self.empty()
-        return node
+        handler = _STATEMENT_DISPATCH.get(self.current_token.type)
+        if handler is not None:
+            return handler(self)
+        if self.current_token.type is TokenType.ID:
+            return self.id_statement()
+        return self.empty()
+
+    def id_statement(self):
+        """An ID starts a proccall_statement if the next token is LPAREN,
+        otherwise an assignment_statement
+        """
+        if self._tokens[self._i + 1].type is TokenType.LPAREN:
+            return self.proccall_statement()
+        return self.assignment_statement()
 
     def while_statement(self):
         """WHILE statement: while expr do Statement"""
         token = self.current_token.type
-        self.eat(TokenType.WHILE)
+        self._eat_while()
         expr = self.relation_statement()
-        self.eat(TokenType.DO)
+        self._eat_do()
         statement = self.statement()
         node = WhileStatement(token, expr, statement)
         return node
@@ -840,12 +933,12 @@ class Parser:
     def if_statement(self):
         """IF/ELSE statement: If expr THEN Statement [ELSE Statement]"""
         token = self.current_token.type
-        self.eat(TokenType.IF)
+        self._eat_if()
         expr = self.relation_statement()
-        self.eat(TokenType.THEN)
+        self._eat_then()
         statement = self.statement()
-        if self.current_token.type == TokenType.ELSE:
-            self.eat(TokenType.ELSE)
+        if self.current_token.type is TokenType.ELSE:
+            self._eat_else()
             else_statement = self.statement()
             node = IfStatement(token ,expr, statement, else_statement)
             return node
@@ -857,23 +950,23 @@ class Parser:
         token = self.current_token
 
         proc_name = self.current_token.value
-        self.eat(TokenType.ID)
-        self.eat(TokenType.LPAREN)
+        self._eat_id()
+        self._eat_lparen()
         actual_params = []
-        if self.current_token.type != TokenType.RPAREN:
+        if self.current_token.type is not TokenType.RPAREN:
             node = self.expr()
             actual_params.append(node)
 
-        while self.current_token.type == TokenType.COMMA:
-            self.eat(TokenType.COMMA)
+        while self.current_token.type is TokenType.COMMA:
+            self._eat_comma()
             node = self.expr()
             actual_params.append(node)
 
-        self.eat(TokenType.RPAREN)
+        self._eat_rparen()
 
         node = ProcedureCall(
             proc_name=proc_name,
-            actual_params=actual_params,
+            actual_params=tuple(actual_params),
             token=token,
         )
         return node
@@ -886,15 +979,15 @@ class Parser:
         token = self.current_token
         # for array assign
         if token.value == '[':
-            self.eat(TokenType.LBRACK)
+            self._eat_lbrack()
             Array_Place = self.current_token
-            self.eat(TokenType.INTEGER_CONST)
-            self.eat(TokenType.RBRACK)
-            self.eat(TokenType.ASSIGN)
+            self._eat_integer_const()
+            self._eat_rbrack()
+            self._eat_assign()
             right = self.expr()
             node = Assign(left, token, right)
             return node
-        self.eat(TokenType.ASSIGN)
+        self._eat_assign()
         right = self.expr()
         node = Assign(left, token, right)
         return node
@@ -907,20 +1000,8 @@ class Parser:
         left = self.expr()
         token = self.current_token
 
-        if self.current_token.type == TokenType.EQUAL:
-            self.eat(TokenType.EQUAL)
-        elif self.current_token.type == TokenType.LESS:
-            self.eat(TokenType.LESS)
-        elif self.current_token.type == TokenType.GREATER:
-            self.eat(TokenType.GREATER)
-        elif self.current_token.type == TokenType.LESSEQUAL:
-            self.eat(TokenType.LESSEQUAL)
-        elif self.current_token.type == TokenType.GREATEREQUAL:
-            self.eat(TokenType.GREATEREQUAL)
-        elif self.current_token.type == TokenType.AND:
-            self.eat(TokenType.AND)
-        elif self.current_token.type == TokenType.OR:
-            self.eat(TokenType.OR)
+        if token.type in _REL_OPS:
+            self.eat(token.type)
         else:
             raise Exception('no match in relation_statement')
 
@@ -933,12 +1014,12 @@ class Parser:
         variable : ID
         """
         node = Var(self.current_token)
-        self.eat(TokenType.ID)
+        self._eat_id()
         return node
 
     def empty(self):
         """An empty production"""
-        return NoOp()
+        return _NOOP
 
     def expr(self):
         """
@@ -946,12 +1027,9 @@ class Parser:
         """
         #TODO: add boolean expr
         node = self.term()
-        while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
+        while self.current_token.type in _ADD_OPS:
             token = self.current_token
-            if token.type == TokenType.PLUS:
-                self.eat(TokenType.PLUS)
-            elif token.type == TokenType.MINUS:
-                self.eat(TokenType.MINUS)
+            self.eat(token.type)
 
             node = BinOp(left=node, op=token, right=self.term())
 
@@ -960,18 +1038,9 @@ class Parser:
     def term(self):
         """term : factor ((MUL | INTEGER_DIV | FLOAT_DIV) factor)*"""
         node = self.factor()
-        while self.current_token.type in (
-                TokenType.MUL,
-                TokenType.INTEGER_DIV,
-                TokenType.FLOAT_DIV,
-        ):
+        while self.current_token.type in _MUL_OPS:
             token = self.current_token
-            if token.type == TokenType.MUL:
-                self.eat(TokenType.MUL)
-            elif token.type == TokenType.INTEGER_DIV:
-                self.eat(TokenType.INTEGER_DIV)
-            elif token.type == TokenType.FLOAT_DIV:
-                self.eat(TokenType.FLOAT_DIV)
+            self.eat(token.type)
 
             node = BinOp(left=node, op=token, right=self.factor())
 
@@ -988,30 +1057,30 @@ class Parser:
                   | EQUAL
         """
         token = self.current_token
-        if token.type == TokenType.PLUS:
-            self.eat(TokenType.PLUS)
+        if token.type is TokenType.PLUS:
+            self._eat_plus()
             node = UnaryOp(token, self.factor())
             return node
-        elif token.type == TokenType.MINUS:
-            self.eat(TokenType.MINUS)
+        elif token.type is TokenType.MINUS:
+            self._eat_minus()
             node = UnaryOp(token, self.factor())
             return node
-        elif token.type == TokenType.INTEGER_CONST:
-            self.eat(TokenType.INTEGER_CONST)
+        elif token.type is TokenType.INTEGER_CONST:
+            self._eat_integer_const()
             return Num(token)
-        elif token.type == TokenType.REAL_CONST:
-            self.eat(TokenType.REAL_CONST)
+        elif token.type is TokenType.REAL_CONST:
+            self._eat_real_const()
             return Num(token)
-        elif token.type == TokenType.LPAREN:
-            self.eat(TokenType.LPAREN)
+        elif token.type is TokenType.LPAREN:
+            self._eat_lparen()
             node = self.expr()
-            self.eat(TokenType.RPAREN)
+            self._eat_rparen()
             return node
-        elif token.type == TokenType.STRING_CONST:
-            self.eat(TokenType.STRING_CONST)
+        elif token.type is TokenType.STRING_CONST:
+            self._eat_string_const()
             return Str(token)
-        # elif token.type == TokenType.EQUAL:
-        #     self.eat(TokenType.EQUAL)
+        # elif token.type is TokenType.EQUAL:
+        #     self._eat_equal()
         #     return Equal(token)
         else:
             node = self.variable()
@@ -1051,7 +1120,7 @@ class Parser:
         variable: ID
         """
         node = self.program()
-        if self.current_token.type != TokenType.EOF:
+        if self.current_token.type is not TokenType.EOF:
             self.error(
                 error_code=ErrorCode.UNEXPECTED_TOKEN,
                 token=self.current_token,
@@ -1060,6 +1129,19 @@ class Parser:
         return node
 
 
+# statement() handlers keyed by the token type a statement starts with;
+# ID is handled separately since it may start a call or an assignment
+_STATEMENT_DISPATCH = {
+    TokenType.BEGIN: Parser.compound_statement,
+    TokenType.WRITELN: Parser.io_statement,
+    TokenType.WRITE: Parser.io_statement,
+    TokenType.READ: Parser.io_statement,
+    TokenType.READLN: Parser.io_statement,
+    TokenType.IF: Parser.if_statement,
+    TokenType.WHILE: Parser.while_statement,
+}
+
+
 
 
 
@@ -1084,9 +1166,15 @@ class Parser:
 ###############################################################################
 
 class NodeVisitor:
+    def __init__(self):
+        # node class -> bound visit_* method, filled in on first sight
+        self._dispatch = {}
+
     def visit(self, node):
-        method_name = 'visit_' + type(node).__name__
-        visitor = getattr(self, method_name, self.generic_visit)
+        visitor = self._dispatch.get(type(node))
+        if visitor is None:
+            visitor = getattr(self, node._visit_method, self.generic_visit)
+            self._dispatch[type(node)] = visitor
         return visitor(node)
 
     def generic_visit(self, node):
@@ -1115,14 +1203,20 @@ class NodeVisitor:
 ###############################################################################
 
 class Symbol:
+    __slots__ = ('name', 'type')
+
     def __init__(self, name, type=None):
         self.name = name
         self.type = type
 
 
 class VarSymbol(Symbol):
+    __slots__ = ('slot',)
+
     def __init__(self, name, type):
         super().__init__(name, type)
+        # activation record slot, assigned to procedure parameters
+        self.slot = None
 
     def __str__(self):
         return "<{class_name}(name='{name}', type='{type}')>".format(
@@ -1135,6 +1229,8 @@ class VarSymbol(Symbol):
 
 
 class BuiltinTypeSymbol(Symbol):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -1148,6 +1244,8 @@ class BuiltinTypeSymbol(Symbol):
         )
 
 class IO_Symbol(Symbol):
+    __slots__ = ('formal_params',)
+
     def __init__(self, name, formal_params=None):
         super().__init__(name)
         # a list of VarSymbol objects
@@ -1164,6 +1262,8 @@ class IO_Symbol(Symbol):
 
 
 class ARRAY_Symbol(Symbol):
+    __slots__ = ()
+
     def __init__(self, start_len, end_len, type, members = []):
         super().__init__(name)
 
@@ -1179,6 +1279,8 @@ class ARRAY_Symbol(Symbol):
     __repr__ = __str__
 
 class IF_Symbol(Symbol):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -1192,6 +1294,8 @@ class IF_Symbol(Symbol):
 
 
 class WHILE_Symbol(Symbol):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -1204,12 +1308,25 @@ class WHILE_Symbol(Symbol):
     __repr__ = __str__
 
 class ProcedureSymbol(Symbol):
+    __slots__ = (
+        'formal_params', 'block_ast', 'slot_names', '_param_slots',
+        '_ar_pool', 'code',
+    )
+
     def __init__(self, name, formal_params=None):
         super().__init__(name)
         # a list of VarSymbol objects
         self.formal_params = [] if formal_params is None else formal_params
         # a reference to procedure's body (AST sub-tree)
         self.block_ast = None
+        # layout of the procedure's activation record, set by semantic analysis
+        self.slot_names = ()
+        # activation record slot of each formal parameter, in order
+        self._param_slots = ()
+        # activation records of finished calls, kept for reuse
+        self._ar_pool = []
+        # block_ast compiled to bytecode, on the first call
+        self.code = None
 
     def __str__(self):
         return '<{class_name}(name={name}, parameters={params})>'.format(
@@ -1224,6 +1341,11 @@ class ProcedureSymbol(Symbol):
 class ScopedSymbolTable:
     def __init__(self, scope_name, scope_level, enclosing_scope=None):
         self._symbols = {}
+        # every visible symbol, this scope's shadowing the enclosing ones;
+        # enclosing scopes do not change while a nested scope is open
+        self._flat = {} if enclosing_scope is None else dict(enclosing_scope._flat)
+        # name -> index in the activation record of this scope
+        self._slots = {}
         self.scope_name = scope_name
         self.scope_level = scope_level
         self.enclosing_scope = enclosing_scope
@@ -1263,25 +1385,49 @@ class ScopedSymbolTable:
             print(msg)
 
     def insert(self, symbol):
-        self.log(f'Insert: {symbol.name}')
+        if _SHOULD_LOG_SCOPE:
+            print(f'Insert: {symbol.name}')
         self._symbols[symbol.name] = symbol
+        self._flat[symbol.name] = symbol
 
-    def lookup(self, name, current_scope_only=False):
-        self.log(f'Lookup: {name}. (Scope name: {self.scope_name})')
-        symbol = self._symbols.get(name)
+    def insert_checked(self, symbol):
+        """Insert `symbol` unless this scope already has one with its name.
 
-        if symbol is not None:
-            return symbol
+        Returns False, leaving the table unchanged, for a duplicate.
+        """
+        if self._symbols.setdefault(symbol.name, symbol) is not symbol:
+            return False
+        if _SHOULD_LOG_SCOPE:
+            print(f'Insert: {symbol.name}')
+        self._flat[symbol.name] = symbol
+        return True
 
-        if current_scope_only:
-            return None
+    def slot(self, name):
+        """Return the activation record slot for `name`, allocating it on first use.
 
-        if self.enclosing_scope is not None:
-            return self.enclosing_scope.lookup(name)
+        Variables are read and written in the activation record that is
+        running, so a scope gets a slot for every name its code touches,
+        including names declared in an enclosing scope.
+        """
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._slots[name] = len(self._slots)
+        return slot
+
+    def slot_names(self):
+        return tuple(self._slots)
+
+    def lookup(self, name, current_scope_only=False):
+        if _SHOULD_LOG_SCOPE:
+            print(f'Lookup: {name}. (Scope name: {self.scope_name})')
+        if current_scope_only:
+            return self._symbols.get(name)
+        return self._flat.get(name)
 
 
 class SemanticAnalyzer(NodeVisitor):
     def __init__(self):
+        super().__init__()
         self.current_scope = None
 
     def log(self, msg):
@@ -1296,13 +1442,14 @@ class SemanticAnalyzer(NodeVisitor):
         )
 
     def visit_Block(self, node):
+        visit = self.visit
         for declaration in node.declarations:
-            self.visit(declaration)
-        self.visit(node.compound_statement)
+            visit(declaration)
+        visit(node.compound_statement)
 
 
     def visit_Str(self, node):
-        type_name = node.value
+        return node
 
     def visit_IO(self, node):
         param = node.value
@@ -1323,7 +1470,7 @@ class SemanticAnalyzer(NodeVisitor):
         self.current_scope.insert(op)
 
 
-    def visit_Program(self, node):
+    def _enter_global_scope(self):
         self.log('ENTER scope: global')
         global_scope = ScopedSymbolTable(
             scope_name='global',
@@ -1332,32 +1479,65 @@ class SemanticAnalyzer(NodeVisitor):
         )
         global_scope._init_builtins()
         self.current_scope = global_scope
+        return global_scope
 
-        # visit subtree
-        self.visit(node.block)
-
-        self.log(global_scope)
+    def _leave_global_scope(self):
+        self.log(self.current_scope)
 
         self.current_scope = self.current_scope.enclosing_scope
         self.log('LEAVE scope: global \n')
 
+    def visit_Program(self, node):
+        global_scope = self._enter_global_scope()
+
+        # visit subtree
+        self.visit(node.block)
+        node.slot_names = global_scope.slot_names()
+
+        self._leave_global_scope()
+
     def visit_Compound(self, node):
+        visit = self.visit
         for child in node.children:
-            self.visit(child)
+            visit(child)
 
     def visit_NoOp(self, node):
         pass
 
+    def _fold(self, node, *operands):
+        """Return a Num holding the value of a constant operation.
+
+        `node` is returned unchanged when the value can't be computed ahead
+        of time, e.g. for a division by zero, so it fails when it runs.
+        """
+        try:
+            value = node.eval_fn(*operands)
+        except ArithmeticError:
+            return node
+        if isinstance(value, int):
+            token_type = TokenType.INTEGER_CONST
+        else:
+            token_type = TokenType.REAL_CONST
+        token = node.token
+        return Num(Token(token_type, value, token.lineno, token.column))
+
+    # Expression visitors return the node that should take the visited
+    # node's place, so constant subexpressions are folded into a Num
+
     def visit_BinOp(self, node):
-        self.visit(node.left)
-        self.visit(node.right)
+        node.left = left = self.visit(node.left)
+        node.right = right = self.visit(node.right)
+        if type(left) is Num and type(right) is Num:
+            return self._fold(node, left.value, right.value)
+        return node
 
     def visit_ProcedureDecl(self, node):
         proc_name = node.proc_name
         proc_symbol = ProcedureSymbol(proc_name)
         self.current_scope.insert(proc_symbol)
 
-        self.log(f'ENTER scope: {proc_name}')
+        if _SHOULD_LOG_SCOPE:
+            print(f'ENTER scope: {proc_name}')
         # Scope for parameters and local variables
         procedure_scope = ScopedSymbolTable(
             scope_name=proc_name,
@@ -1371,15 +1551,21 @@ class SemanticAnalyzer(NodeVisitor):
             param_type = self.current_scope.lookup(param.type_node.value)
             param_name = param.var_node.value
             var_symbol = VarSymbol(param_name, param_type)
+            var_symbol.slot = self.current_scope.slot(param_name)
             self.current_scope.insert(var_symbol)
             proc_symbol.formal_params.append(var_symbol)
+        proc_symbol._param_slots = tuple(
+            param_symbol.slot for param_symbol in proc_symbol.formal_params
+        )
 
         self.visit(node.block_node)
+        proc_symbol.slot_names = procedure_scope.slot_names()
 
         self.log(procedure_scope)
 
         self.current_scope = self.current_scope.enclosing_scope
-        self.log(f'LEAVE scope: {proc_name}')
+        if _SHOULD_LOG_SCOPE:
+            print(f'LEAVE scope: {proc_name}')
 
         # accessed by the interpreter when executing procedure call
         proc_symbol.block_ast = node.block_node
@@ -1392,14 +1578,12 @@ class SemanticAnalyzer(NodeVisitor):
         var_symbol = VarSymbol(var_name, type_symbol)
 
         # Signal an error if the table already has a symbol with the same name
-        if self.current_scope.lookup(var_name, current_scope_only=True):
+        if not self.current_scope.insert_checked(var_symbol):
             self.error(
                 error_code=ErrorCode.DUPLICATE_ID,
                 token=node.var_node.token,
             )
 
-        self.current_scope.insert(var_symbol)
-
     def visit_ARRAY(self, node):
         start = node.start
         end = node.end
@@ -1411,7 +1595,7 @@ class SemanticAnalyzer(NodeVisitor):
 
     def visit_Assign(self, node):
         # right-hand side
-        self.visit(node.right)
+        node.right = self.visit(node.right)
         # left-hand side
         self.visit(node.left)
 
@@ -1421,16 +1605,22 @@ class SemanticAnalyzer(NodeVisitor):
         var_symbol = self.current_scope.lookup(var_name)
         if var_symbol is None:
             self.error(error_code=ErrorCode.ID_NOT_FOUND, token=node.token)
+        node.slot = self.current_scope.slot(var_name)
+        return node
 
     def visit_Num(self, node):
-        pass
+        return node
 
     def visit_UnaryOp(self, node):
-        pass
+        node.expr = expr = self.visit(node.expr)
+        if type(expr) is Num:
+            return self._fold(node, expr.value)
+        return node
 
     def visit_ProcedureCall(self, node):
-        for param_node in node.actual_params:
-            self.visit(param_node)
+        node.actual_params = tuple(
+            self.visit(param_node) for param_node in node.actual_params
+        )
 
         proc_symbol = self.current_scope.lookup(node.proc_name)
         # accessed by the interpreter when executing procedure call
@@ -1441,11 +1631,28 @@ class SemanticAnalyzer(NodeVisitor):
         name = node.name
         symbol = IF_Symbol(name)
         self.current_scope.insert(symbol)
+        # the interpreter evaluates the left side of the condition
+        node.expr.left = self.visit(node.expr.left)
 
     def visit_WhileStatement(self, node):
         name = node.name
         symbol = IF_Symbol(name)
         self.current_scope.insert(symbol)
+        # the interpreter evaluates the left side of the condition
+        node.expr.left = self.visit(node.expr.left)
+
+
+
+
+
+
+
+
+
+
+
+
+
 
 
 
@@ -1453,6 +1660,130 @@ class SemanticAnalyzer(NodeVisitor):
 
 
 
+
+
+
+###############################################################################
+#                                                                             #
+#  BYTECODE COMPILER                                                          #
+#                                                                             #
+###############################################################################
+
+# opcodes; each instruction is an (opcode, operand) pair
+OP_CONST = 0   # push operand
+OP_LOAD = 1    # push the variable in activation record slot `operand`
+OP_STORE = 2   # pop into activation record slot `operand`
+OP_BINARY = 3  # pop two values, push operand(left, right)
+OP_UNARY = 4   # replace the top of the stack with operand(top)
+OP_CALL = 5    # call ProcedureCall `operand[0]` with `operand[1]` stacked args
+OP_EXEC = 6    # hand node `operand` to the tree-walking visitor
+
+
+class Code:
+    """A statement list compiled to straight-line stack machine code"""
+    __slots__ = ('instructions',)
+
+    def __init__(self, instructions):
+        self.instructions = instructions
+
+    def __str__(self):
+        return '\n'.join(
+            '{index:4} {name:<7} {operand!r}'.format(
+                index=index,
+                name=_OP_NAMES[op],
+                operand=operand,
+            )
+            for index, (op, operand) in enumerate(self.instructions)
+        )
+
+    __repr__ = __str__
+
+
+_OP_NAMES = ('CONST', 'LOAD', 'STORE', 'BINARY', 'UNARY', 'CALL', 'EXEC')
+
+
+class Compiler(NodeVisitor):
+    """Compile an analyzed block into a Code object.
+
+    Needs the slots and procedure symbols set by SemanticAnalyzer, and the
+    constants it folded. Only assignments, expressions and calls are
+    compiled; if/while and I/O statements are kept as nodes for the
+    interpreter's visitors, since they only log. Nothing the language
+    has needs a jump, so the code runs straight through.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.instructions = []
+
+    def compile(self, node):
+        self.instructions = []
+        self.visit(node)
+        return Code(tuple(self.instructions))
+
+    def emit(self, op, operand=None):
+        self.instructions.append((op, operand))
+
+    def visit_Block(self, node):
+        # declarations have no run-time effect
+        self.visit(node.compound_statement)
+
+    def visit_Compound(self, node):
+        visit = self.visit
+        for child in node.children:
+            visit(child)
+
+    def visit_NoOp(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        self.visit(node.right)
+        self.emit(OP_STORE, node.left.slot)
+
+    def visit_Var(self, node):
+        self.emit(OP_LOAD, node.slot)
+
+    def visit_Num(self, node):
+        self.emit(OP_CONST, node.value)
+
+    def visit_Str(self, node):
+        self.emit(OP_CONST, node.value)
+
+    def visit_BinOp(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+        self.emit(OP_BINARY, node.eval_fn)
+
+    def visit_UnaryOp(self, node):
+        self.visit(node.expr)
+        self.emit(OP_UNARY, node.eval_fn)
+
+    def visit_ProcedureCall(self, node):
+        proc_symbol = node.proc_symbol
+        if not isinstance(proc_symbol, ProcedureSymbol):
+            # not a declared procedure; the call fails when it runs, after
+            # the statements before it
+            self.emit(OP_EXEC, node)
+            return
+        # like the tree walk, bind only as many arguments as there are
+        # parameters to take them
+        argc = min(len(proc_symbol._param_slots), len(node.actual_params))
+        for argument_node in node.actual_params[:argc]:
+            self.visit(argument_node)
+        self.emit(OP_CALL, (node, argc))
+
+    def _emit_exec(self, node):
+        self.emit(OP_EXEC, node)
+
+    visit_IfStatement = _emit_exec
+    visit_WhileStatement = _emit_exec
+    visit_WRITE = _emit_exec
+    visit_READ = _emit_exec
+
+
+
+
+
 
 
 
@@ -1481,6 +1812,16 @@ class ARType(Enum):
     PROCEDURE = 'PROCEDURE'
 
 
+# relational operators the if/while conditions can evaluate
+_CMP_OPS = {
+    TokenType.EQUAL: operator.eq,
+    TokenType.LESS: operator.lt,
+    TokenType.LESSEQUAL: operator.le,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATEREQUAL: operator.ge,
+}
+
+
 class CallStack:
     def __init__(self):
         self._records = []
@@ -1491,9 +1832,6 @@ class CallStack:
     def pop(self):
         return self._records.pop()
 
-    def look_at_next_char(self):
-        return self._records[-1]
-
     def __str__(self):
         s = '\n'.join(repr(ar) for ar in reversed(self._records))
         s = f'CALL STACK\n{s}\n\n'
@@ -1503,23 +1841,51 @@ class CallStack:
         return self.__str__()
 
 
+# value of an activation record slot that has not been assigned; reading
+# it gives None
+_UNSET = object()
+
+
 class ActivationRecord:
-    def __init__(self, name, type, nesting_level):
+    __slots__ = (
+        'name', 'type', 'nesting_level', 'slot_names', 'slots', 'assigned',
+        'counter',
+    )
+
+    def __init__(self, name, type, nesting_level, slot_names=()):
         self.name = name
         self.type = type
         self.nesting_level = nesting_level
-        self.members = {}
+        # variable values indexed by Var.slot; _UNSET until assigned
+        self.slot_names = slot_names
+        self.slots = [_UNSET] * len(slot_names)
+        # slots in the order they were first assigned
+        self.assigned = []
         self.counter = 0
 
+    def reset(self):
+        """Clear the record so another call can reuse it"""
+        slots = self.slots
+        slots[:] = [_UNSET] * len(slots)
+        del self.assigned[:]
+        self.counter = 0
 
-    def __setitem__(self, key, value):
-        self.members[key] = value
+    def load(self, slot):
+        value = self.slots[slot]
+        return None if value is _UNSET else value
 
-    def __getitem__(self, key):
-        return self.members[key]
+    def store(self, slot, value):
+        slots = self.slots
+        if slots[slot] is _UNSET:
+            self.assigned.append(slot)
+        slots[slot] = value
 
-    def get(self, key):
-        return self.members.get(key)
+    @property
+    def members(self):
+        """The assigned variables as a name -> value dict, in assignment order"""
+        slot_names = self.slot_names
+        slots = self.slots
+        return {slot_names[slot]: slots[slot] for slot in self.assigned}
 
     def log(self, msg):
         if _SHOULD_LOG_MIPS:
@@ -1536,7 +1902,8 @@ class ActivationRecord:
 
         for name, val in self.members.items():
             lines.append(f'   {name:<20}: {val}')
-            self.log(f'li $t{self.counter}, {val}\n')
+            if _SHOULD_LOG_MIPS:
+                print(f'li $t{self.counter}, {val}\n')
             self.counter+=1
             #machine_code_out(val)
         s = '\n'.join(lines)
@@ -1550,45 +1917,46 @@ class ActivationRecord:
 
 class Interpreter(NodeVisitor):
     def __init__(self, tree):
+        super().__init__()
         self.tree = tree
         self.call_stack = CallStack()
+        # the activation record on top of the call stack
+        self.current_ar = None
 
     def log(self, msg):
         if _SHOULD_LOG_STACK:
             print(msg)
 
-    def visit_Program(self, node):
+    def _enter_program(self, node):
         program_name = node.name
-        self.log(f'ENTER: PROGRAM {program_name}')
+        if _SHOULD_LOG_STACK:
+            print(f'ENTER: PROGRAM {program_name}')
         ar = ActivationRecord(
             name=program_name,
             type=ARType.PROGRAM,
             nesting_level=1,
+            slot_names=node.slot_names,
         )
         self.call_stack.push(ar)
+        self.current_ar = ar
 
-        self.log(str(self.call_stack))
+        if _SHOULD_LOG_STACK or _SHOULD_LOG_MIPS:
+            # building the text also emits the --mips lines
+            self.log(str(self.call_stack))
 
-        self.visit(node.block)
-
-        self.log(f'LEAVE: PROGRAM {program_name}')
-        self.log(str(self.call_stack))
+    def _leave_program(self, node):
+        if _SHOULD_LOG_STACK:
+            print(f'LEAVE: PROGRAM {node.name}')
+        if _SHOULD_LOG_STACK or _SHOULD_LOG_MIPS:
+            self.log(str(self.call_stack))
 
         self.call_stack.pop()
+        self.current_ar = None
 
-    def visit_Block(self, node):
-        for declaration in node.declarations:
-            self.visit(declaration)
-        self.visit(node.compound_statement)
-
-    def visit_VarDecl(self, node):
-        # Do nothing
-        pass
-
-    def visit_Type(self, node):
-        # Do nothing
-        pass
-
+    def visit_Program(self, node):
+        self._enter_program(node)
+        self.run(Compiler().compile(node.block))
+        self._leave_program(node)
 
     def visit_Str(self, node):
         type_name = node.value
@@ -1598,213 +1966,269 @@ class Interpreter(NodeVisitor):
         param = node.value
         op = node.op
         #return param, op
-        if  node.op == TokenType.WRITELN:
-            self.log(f'{str(op).strip("TokenType.")} -> {param} \\n \n')
+        if op is TokenType.WRITELN:
+            if _SHOULD_LOG_STACK:
+                print(f'{op.name} -> {param} \\n \n')
         else:
-            self.log(f'{str(op).strip("TokenType.")} -> {param}\n')
+            if _SHOULD_LOG_STACK:
+                print(f'{op.name} -> {param}\n')
 
     def visit_READ(self, node):
         param = node.value
         op = node.op
         #return param, op
-        if  node.op == TokenType.READLN:
-            self.log(f'{str(op).strip("TokenType.")} -> {param} \\n \n')
+        if op is TokenType.READLN:
+            if _SHOULD_LOG_STACK:
+                print(f'{op.name} -> {param} \\n \n')
         else:
-            self.log(f'{str(op).strip("TokenType.")} -> {param}\n')
+            if _SHOULD_LOG_STACK:
+                print(f'{op.name} -> {param}\n')
 
 
     def visit_BinOp(self, node):
-        if node.op.type == TokenType.PLUS:
-            return self.visit(node.left) + self.visit(node.right)
-        elif node.op.type == TokenType.MINUS:
-            return self.visit(node.left) - self.visit(node.right)
-        elif node.op.type == TokenType.MUL:
-            return self.visit(node.left) * self.visit(node.right)
-        elif node.op.type == TokenType.INTEGER_DIV:
-            return self.visit(node.left) // self.visit(node.right)
-        elif node.op.type == TokenType.FLOAT_DIV:
-            return float(self.visit(node.left)) / float(self.visit(node.right))
+        return node.eval_fn(self.visit(node.left), self.visit(node.right))
 
     def visit_Num(self, node):
         return node.value
 
     def visit_UnaryOp(self, node):
-        op = node.op.type
-        if op == TokenType.PLUS:
-            return +self.visit(node.expr)
-        elif op == TokenType.MINUS:
-            return -self.visit(node.expr)
-
-    def visit_Compound(self, node):
-        for child in node.children:
-            self.visit(child)
-
-    def visit_Assign(self, node):
-        var_name = node.left.value
-        var_value = self.visit(node.right)
-
-        ar = self.call_stack.look_at_next_char()
-        ar[var_name] = var_value
+        return node.eval_fn(self.visit(node.expr))
 
     def visit_Var(self, node):
-        var_name = node.value
-
-        ar = self.call_stack.look_at_next_char()
-        var_value = ar.get(var_name)
-
-        return var_value
-
-    def visit_NoOp(self, node):
-        pass
-
-    def visit_ProcedureDecl(self, node):
-        pass
-
-    def visit_ProcedureCall(self, node):
-        proc_name = node.proc_name
-
-        ar = ActivationRecord(
-            name=proc_name,
+        return self.current_ar.load(node.slot)
+
+    def _procedure_ar(self, proc_symbol):
+        """Return an empty activation record for a call to `proc_symbol`"""
+        ar_pool = proc_symbol._ar_pool
+        if ar_pool:
+            ar = ar_pool.pop()
+            ar.reset()
+            return ar
+        return ActivationRecord(
+            name=proc_symbol.name,
             type=ARType.PROCEDURE,
             nesting_level=2,
+            slot_names=proc_symbol.slot_names,
         )
 
+    def visit_ProcedureCall(self, node):
         proc_symbol = node.proc_symbol
+        ar = self._procedure_ar(proc_symbol)
 
-        formal_params = proc_symbol.formal_params
+        param_slots = proc_symbol._param_slots
         actual_params = node.actual_params
 
-        for param_symbol, argument_node in zip(formal_params, actual_params):
-            ar[param_symbol.name] = self.visit(argument_node)
+        # arguments are evaluated in the caller's activation record;
+        # arity is not checked, surplus arguments or parameters are ignored
+        visit = self.visit
+        for i in range(min(len(param_slots), len(actual_params))):
+            ar.store(param_slots[i], visit(actual_params[i]))
+
+        self._call(node, ar)
 
+    def _call(self, node, ar):
+        """Run the procedure of ProcedureCall `node` in `ar`, its arguments bound"""
+        proc_name = node.proc_name
+        proc_symbol = node.proc_symbol
+
+        caller_ar = self.current_ar
         self.call_stack.push(ar)
+        self.current_ar = ar
 
-        self.log(f'ENTER: PROCEDURE {proc_name}')
-        self.log(str(self.call_stack))
+        if _SHOULD_LOG_STACK:
+            print(f'ENTER: PROCEDURE {proc_name}')
+        if _SHOULD_LOG_STACK or _SHOULD_LOG_MIPS:
+            self.log(str(self.call_stack))
 
         # evaluate procedure body
-        self.visit(proc_symbol.block_ast)
+        code = proc_symbol.code
+        if code is None:
+            code = proc_symbol.code = Compiler().compile(proc_symbol.block_ast)
+        self.run(code)
 
-        self.log(f'LEAVE: PROCEDURE {proc_name}')
-        self.log(str(self.call_stack))
+        if _SHOULD_LOG_STACK:
+            print(f'LEAVE: PROCEDURE {proc_name}')
+        if _SHOULD_LOG_STACK or _SHOULD_LOG_MIPS:
+            self.log(str(self.call_stack))
 
         self.call_stack.pop()
-
+        self.current_ar = caller_ar
+        proc_symbol._ar_pool.append(ar)
+
+    def run(self, code):
+        """Execute `code` in the current activation record"""
+        current_ar = self.current_ar
+        slots = current_ar.slots
+        mark_assigned = current_ar.assigned.append
+        unset = _UNSET
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for op, operand in code.instructions:
+            if op == OP_LOAD:
+                value = slots[operand]
+                push(None if value is unset else value)
+            elif op == OP_CONST:
+                push(operand)
+            elif op == OP_BINARY:
+                right = pop()
+                stack[-1] = operand(stack[-1], right)
+            elif op == OP_STORE:
+                if slots[operand] is unset:
+                    mark_assigned(operand)
+                slots[operand] = pop()
+            elif op == OP_UNARY:
+                stack[-1] = operand(stack[-1])
+            elif op == OP_CALL:
+                node, argc = operand
+                proc_symbol = node.proc_symbol
+                ar = self._procedure_ar(proc_symbol)
+                store = ar.store
+                param_slots = proc_symbol._param_slots
+                # the arguments were pushed in order; bind them in that
+                # order so the record lists the parameters first to last
+                first = len(stack) - argc
+                for i in range(argc):
+                    store(param_slots[i], stack[first + i])
+                del stack[first:]
+                self._call(node, ar)
+            else:  # OP_EXEC
+                self.visit(operand)
+
+
+    def _branch_result(self, statement):
+        """Return the (name, value) pair an if/while branch assigns"""
+        return statement.left.value, statement.right.value
 
     def visit_IfStatement(self, node):
         # If part
         left_value = self.visit(node.expr.left)
-        token = str(node.expr.token.type)
+        compare = _CMP_OPS.get(node.expr.token.type)
         right = node.expr.right.value
-        # then Part
-        # ar = self.call_stack.look_at_next_char()
-        # print(ar)
-        if token == 'TokenType.EQUAL':
-            if left_value == right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'IF Statement Result => {left_value_then}  : {right_then}\n')
-            else:
-                #else part
-                left_value_else = node.elseStatement.left.value
-                token_else = node.elseStatement.token.type
-                right_else = node.elseStatement.right.value
-                self.log(f'IF Statement Result => {left_value_else}  : {right_else}\n')
-
-        if token == 'TokenType.LESS':
-            if left_value < right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'IF Statement Result => {left_value_then}  : {right_then}\n')
-            else:
-                #else part
-                left_value_else = node.elseStatement.left.value
-                token_else = node.elseStatement.token.type
-                right_else = node.elseStatement.right.value
-                self.log(f'IF Statement Result => {left_value_else}  : {right_else}\n')
-
-        if token == 'TokenType.LESSEQUAL':
-            if left_value <= right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'IF Statement Result => {left_value_then}  : {right_then}\n')
-            else:
-                #else part
-                left_value_else = node.elseStatement.left.value
-                token_else = node.elseStatement.token.type
-                right_else = node.elseStatement.right.value
-                self.log(f'IF Statement Result => {left_value_else}  : {right_else}\n')
-
-        if token == 'TokenType.GREATER':
-            if left_value > right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'IF Statement Result => {left_value_then}  : {right_then}\n')
-            else:
-                #else part
-                left_value_else = node.elseStatement.left.value
-                token_else = node.elseStatement.token.type
-                right_else = node.elseStatement.right.value
-                self.log(f'IF Statement Result => {left_value_else}  : {right_else}\n')
-
-        if token == 'TokenType.GREATEREQUAL':
-            if left_value >= right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'IF Statement Result => {left_value_then}  : {right_then}\n')
-            else:
-                #else part
-                left_value_else = node.elseStatement.left.value
-                token_else = node.elseStatement.token.type
-                right_else = node.elseStatement.right.value
-                self.log(f'IF Statement Result => {left_value_else}  : {right_else}\n')
-
+        if compare is None:
+            return
+        if compare(left_value, right):
+            # then part
+            name, value = self._branch_result(node.statement)
+        elif node.elseStatement is not None:
+            # else part
+            name, value = self._branch_result(node.elseStatement)
+        else:
+            return
+        if _SHOULD_LOG_STACK:
+            print(f'IF Statement Result => {name}  : {value}\n')
 
     def visit_WhileStatement(self, node):
         # While
         left_value = self.visit(node.expr.left)
-        token = str(node.expr.token.type)
+        compare = _CMP_OPS.get(node.expr.token.type)
         right = node.expr.right.value
         # Do
-        if token == 'TokenType.EQUAL':
-            if left_value == right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'While Statement Result => {left_value_then}  : {right_then}\n')
-
-        if token == 'TokenType.GREATER':
-            if left_value > right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'While Statement Result => {left_value_then}  : {right_then}\n')
-
-        if token == 'TokenType.GREATEREQUAL':
-            if left_value >= right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'While Statement Result => {left_value_then}  : {right_then}\n')
-
-        if token == 'TokenType.LESS':
-            if left_value < right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'While Statement Result => {left_value_then}  : {right_then}\n')
-
-        if token == 'TokenType.LESSEQUAL':
-            if left_value <= right:
-                left_value_then = node.statement.left.value
-                token_then = node.statement.token.type
-                right_then = node.statement.right.value
-                self.log(f'While Statement Result => {left_value_then}  : {right_then}\n')
+        if compare is not None and compare(left_value, right):
+            name, value = self._branch_result(node.statement)
+            if _SHOULD_LOG_STACK:
+                print(f'While Statement Result => {name}  : {value}\n')
+
+    def interpret(self):
+        tree = self.tree
+        if tree is None:
+            return ''
+        return self.visit(tree)
+
+
+class AnalyzeAndRun(NodeVisitor):
+    """Analyze and execute the main program in a single tree walk.
+
+    The statements of the main program are resolved and run as they are
+    visited, so each of their nodes is walked once instead of twice.
+    Declarations, procedure bodies included, are only analyzed, using a
+    SemanticAnalyzer, because they are complete before the statements
+    that run them. The statements that have little to fuse (calls,
+    if/while, I/O) are handed to the analyzer and then to an Interpreter.
+    Semantic errors are therefore raised while the program runs, rather
+    than before it starts.
+    """
+
+    def __init__(self, tree):
+        super().__init__()
+        self.tree = tree
+        self.analyzer = SemanticAnalyzer()
+        self.interpreter = Interpreter(tree)
+
+    def _grow_frame(self):
+        """Give the program record a slot for every name resolved so far"""
+        ar = self.interpreter.current_ar
+        slot_names = self.analyzer.current_scope.slot_names()
+        ar.slots.extend([_UNSET] * (len(slot_names) - len(ar.slots)))
+        ar.slot_names = slot_names
+
+    def visit_Program(self, node):
+        analyzer, interpreter = self.analyzer, self.interpreter
+
+        global_scope = analyzer._enter_global_scope()
+        # the tree is not analyzed yet, so the record starts with no slots;
+        # they are added as the statements resolve names
+        interpreter._enter_program(node)
+
+        self.visit(node.block)
+        node.slot_names = global_scope.slot_names()
+
+        interpreter._leave_program(node)
+        analyzer._leave_global_scope()
+
+    def visit_Block(self, node):
+        analyze = self.analyzer.visit
+        for declaration in node.declarations:
+            analyze(declaration)
+        self.visit(node.compound_statement)
+
+    def visit_Compound(self, node):
+        visit = self.visit
+        for child in node.children:
+            visit(child)
+
+    def visit_NoOp(self, node):
+        pass
+
+    def visit_Num(self, node):
+        return node.value
+
+    def visit_Str(self, node):
+        return node.value
+
+    def visit_BinOp(self, node):
+        return node.eval_fn(self.visit(node.left), self.visit(node.right))
+
+    def visit_UnaryOp(self, node):
+        return node.eval_fn(self.visit(node.expr))
+
+    def visit_Assign(self, node):
+        var_value = self.visit(node.right)
+
+        var_node = node.left
+        self.analyzer.visit_Var(var_node)
+        ar = self.interpreter.current_ar
+        if var_node.slot >= len(ar.slots):
+            self._grow_frame()
+        ar.store(var_node.slot, var_value)
+
+    def visit_Var(self, node):
+        self.analyzer.visit_Var(node)
+        ar = self.interpreter.current_ar
+        if node.slot >= len(ar.slots):
+            self._grow_frame()
+        return ar.load(node.slot)
+
+    def _analyze_then_run(self, node):
+        self.analyzer.visit(node)
+        self._grow_frame()
+        self.interpreter.visit(node)
+
+    visit_ProcedureCall = _analyze_then_run
+    visit_IfStatement = _analyze_then_run
+    visit_WhileStatement = _analyze_then_run
+    visit_WRITE = _analyze_then_run
+    visit_READ = _analyze_then_run
 
     def interpret(self):
         tree = self.tree
@@ -1856,6 +2280,11 @@ def main():
         help='Print lexer tokens',
         action='store_true',
     )
+    parser.add_argument(
+        '--jit',
+        help='Analyze and run the program in a single pass',
+        action='store_true',
+    )
     args = parser.parse_args()
 
     global _SHOULD_LOG_SCOPE, _SHOULD_LOG_STACK, _SHOULD_LOG_LEXER, _SHOULD_LOG_VISITOR, _SHOULD_LOG_MIPS
@@ -1871,6 +2300,14 @@ def main():
         print(e.message)
         sys.exit(1)
 
+    if args.jit:
+        try:
+            AnalyzeAndRun(tree).interpret()
+        except SemanticError as e:
+            print(e.message)
+            sys.exit(1)
+        return
+
     semantic_analyzer = SemanticAnalyzer()
     try:
         semantic_analyzer.visit(tree)